@@ -2,27 +2,47 @@
 """
 Architecture validation for ThinkBank:
 1) Check vLLM OpenAI endpoint connectivity.
-2) Check embedding model device is CPU.
+2) Check embedding model device is CPU (pass --deep to load the weights).
 """
 
-import json
+import asyncio
+import importlib.util
 import os
 import sys
 from pathlib import Path
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+
+import httpx
+import orjson
 
 
 PROJECT_ROOT = Path(__file__).resolve().parent
 
+# Shared keep-alive client for all HTTP probes.
+_PROBE = httpx.Client(
+    timeout=httpx.Timeout(8.0, connect=2.0),
+    headers={"Authorization": "Bearer sk-local"},
+)
+
+
+_HF_INIT = False
+
 
 def _ensure_local_hf_cache() -> None:
     """Use project-local HF cache to avoid root-owned global cache issues."""
+    global _HF_INIT
+    if _HF_INIT:
+        return
+    _HF_INIT = True
+
     hf_home = Path(os.getenv("HF_HOME", PROJECT_ROOT / ".hf-cache"))
     hf_home.mkdir(parents=True, exist_ok=True)
     os.environ["HF_HOME"] = str(hf_home)
     os.environ.setdefault("HUGGINGFACE_HUB_CACHE", str(hf_home / "hub"))
     os.environ.setdefault("TRANSFORMERS_CACHE", str(hf_home / "transformers"))
+    os.environ.setdefault("HF_HUB_DISABLE_SYMLINKS_WARNING", "1")
+    # Rust multi-connection downloader for cold model fetches (only if installed).
+    if importlib.util.find_spec("hf_transfer") is not None:
+        os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
 
 
 def check_llm_models() -> bool:
@@ -30,20 +50,14 @@ def check_llm_models() -> bool:
     url = "http://localhost:8000/v1/models"
     print(f"[LLM] GET {url}")
 
-    request = Request(
-        url,
-        headers={
-            "Authorization": "Bearer sk-local",
-        },
-    )
-
     try:
-        with urlopen(request, timeout=8) as response:
-            payload = json.loads(response.read().decode("utf-8"))
+        response = _PROBE.get(url)
+        response.raise_for_status()
+        payload = orjson.loads(response.content)
         model_ids = [item.get("id", "<unknown>") for item in payload.get("data", [])]
         print(f"[LLM] OK, discovered models: {model_ids}")
         return True
-    except (HTTPError, URLError, TimeoutError, ValueError) as exc:
+    except (httpx.HTTPError, ValueError) as exc:
         print(f"[LLM] FAILED: {exc}")
         return False
 
@@ -54,12 +68,6 @@ def _detect_embedding_device(embedder) -> str:
     if model is None:
         return "unknown"
 
-    client = getattr(model, "client", None)
-    if client is not None:
-        target_device = getattr(client, "_target_device", None)
-        if target_device is not None:
-            return str(target_device)
-
     target_device = getattr(model, "_target_device", None)
     if target_device is not None:
         return str(target_device)
@@ -71,22 +79,25 @@ def _detect_embedding_device(embedder) -> str:
     return "unknown"
 
 
-def check_embedding_device() -> bool:
-    """Load text embedding model and print target device."""
+def check_embedding_device(deep: bool = False) -> bool:
+    """Print the text embedding model's target device.
+
+    By default the configured device is reported without loading weights;
+    ``deep`` loads the model and inspects the runtime device instead.
+    """
     project_root = Path(__file__).resolve().parent
     sys.path.insert(0, str(project_root / "python-ai"))
 
     try:
         from core.embeddings import TextEmbeddingModel
 
-        print("[Embedding] Loading BAAI/bge-m3 ...")
         embedder = TextEmbeddingModel(model_name="BAAI/bge-m3")
-        embedder.load()
-
-        if hasattr(embedder, "get_device"):
-            device = str(embedder.get_device())
-        else:
+        if deep:
+            print("[Embedding] Loading BAAI/bge-m3 ...")
+            embedder.load()
             device = _detect_embedding_device(embedder)
+        else:
+            device = str(embedder.get_device())
 
         print(f"[Embedding] device: {device}")
         return "cpu" in device.lower()
@@ -95,10 +106,13 @@ def check_embedding_device() -> bool:
         return False
 
 
-def main() -> int:
+async def main(deep: bool = False) -> int:
     _ensure_local_hf_cache()
-    llm_ok = check_llm_models()
-    embedding_ok = check_embedding_device()
+    # The HTTP probe is negligible next to a (deep) model load; overlap the two.
+    llm_ok, embedding_ok = await asyncio.gather(
+        asyncio.to_thread(check_llm_models),
+        asyncio.to_thread(check_embedding_device, deep),
+    )
 
     print("\nSummary:")
     print(f"- LLM endpoint check: {'PASS' if llm_ok else 'FAIL'}")
@@ -108,4 +122,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(asyncio.run(main(deep="--deep" in sys.argv[1:])))
@@ -2,15 +2,29 @@
 import redis
 import os
 
+REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
+REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
+PREVIEW_SIZE = 50
+
+_POOL = redis.ConnectionPool(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    db=0,
+    max_connections=int(os.getenv('REDIS_POOL_SIZE', str(2 * (os.cpu_count() or 1)))),
+)
+
 def check():
-    host = os.getenv('REDIS_HOST', 'localhost')
-    port = int(os.getenv('REDIS_PORT', 6379))
-    r = redis.Redis(host=host, port=port, db=0)
+    r = redis.Redis(connection_pool=_POOL)
     queue_name = os.getenv('REDIS_QUEUE_NAME', 'thinkbank:tasks')
-    print(f"Checking queue: {queue_name} on {host}:{port}")
-    tasks = r.lrange(queue_name, 0, -1)
-    print(f"Tasks in queue: {tasks}")
-    print(f"Queue size: {r.llen(queue_name)}")
+    print(f"Checking queue: {queue_name} on {REDIS_HOST}:{REDIS_PORT}")
+    # Plain pipeline (no MULTI/EXEC): both reads go out in a single round trip.
+    pipe = r.pipeline(transaction=False)
+    pipe.lrange(queue_name, 0, PREVIEW_SIZE - 1)
+    pipe.llen(queue_name)
+    tasks, size = pipe.execute()
+    tasks = [t.decode('utf-8', errors='replace') for t in tasks]
+    print(f"Tasks in queue (first {PREVIEW_SIZE}): {tasks}")
+    print(f"Queue size: {size}")
 
 if __name__ == '__main__':
     check()
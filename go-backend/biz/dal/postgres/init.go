@@ -57,6 +57,16 @@ func getEnvInt(key string, fallback int) int {
 	return value
 }
 
+// VectorType returns the pgvector column type used for embeddings:
+// "vector" (float32, default) or "halfvec" (float16, half the storage and
+// index size; needs pgvector >= 0.7). Set via EMBEDDING_VECTOR_TYPE.
+func VectorType() string {
+	if strings.EqualFold(strings.TrimSpace(os.Getenv("EMBEDDING_VECTOR_TYPE")), "halfvec") {
+		return "halfvec"
+	}
+	return "vector"
+}
+
 func getEnvBool(key string, fallback bool) bool {
 	raw := strings.TrimSpace(strings.ToLower(os.Getenv(key)))
 	if raw == "" {
@@ -135,42 +145,68 @@ func migrateSchema(db *gorm.DB) error {
 		return err
 	}
 
-	// Use raw SQL here to preserve pgvector column types.
-	if err := db.Exec(`
+	// content_hash is written and read only by the AI worker (duplicate
+	// detection), so it is not part of model.Asset.
+	contentHashStatements := []string{
+		`ALTER TABLE assets ADD COLUMN IF NOT EXISTS content_hash BYTEA`,
+		`CREATE INDEX IF NOT EXISTS idx_assets_content_hash ON assets (content_hash) WHERE content_hash IS NOT NULL`,
+	}
+	for _, stmt := range contentHashStatements {
+		if err := db.Exec(stmt).Error; err != nil {
+			return err
+		}
+	}
+
+	vt := VectorType()
+	createEmbeddings := fmt.Sprintf(`
 		CREATE TABLE IF NOT EXISTS asset_embeddings (
 			asset_id UUID REFERENCES assets(id) ON DELETE CASCADE,
-			semantic_vector vector(1024),
-			visual_vector vector(512),
+			semantic_vector %[1]s(1024),
+			visual_vector %[1]s(512),
 			PRIMARY KEY (asset_id)
 		)
-	`).Error; err != nil {
+	`, vt)
+
+	// Use raw SQL here to preserve pgvector column types.
+	if err := db.Exec(createEmbeddings).Error; err != nil {
+		return err
+	}
+
+	// The ivfflat indexes are tied to the element type's operator class, so
+	// they must go before the columns switch between vector and halfvec.
+	var currentType string
+	if err := db.Raw(`
+		SELECT format_type(atttypid, NULL) FROM pg_attribute
+		WHERE attrelid = 'asset_embeddings'::regclass AND attname = 'semantic_vector'
+	`).Scan(&currentType).Error; err != nil {
 		return err
 	}
+	if currentType != vt {
+		log.Printf("switching embedding columns from %s to %s", currentType, vt)
+		for _, idx := range []string{"idx_semantic_vector", "idx_visual_vector"} {
+			if err := db.Exec(`DROP INDEX IF EXISTS ` + idx).Error; err != nil {
+				return err
+			}
+		}
+	}
 
-	// Ensure column dimensions match current embedding models.
-	if err := db.Exec(`ALTER TABLE asset_embeddings ALTER COLUMN semantic_vector TYPE vector(1024)`).Error; err != nil {
+	// Ensure column types and dimensions match current embedding models.
+	if err := db.Exec(fmt.Sprintf(`ALTER TABLE asset_embeddings ALTER COLUMN semantic_vector TYPE %s(1024)`, vt)).Error; err != nil {
 		return err
 	}
-	if err := db.Exec(`ALTER TABLE asset_embeddings ALTER COLUMN visual_vector TYPE vector(512)`).Error; err != nil {
+	if err := db.Exec(fmt.Sprintf(`ALTER TABLE asset_embeddings ALTER COLUMN visual_vector TYPE %s(512)`, vt)).Error; err != nil {
 		log.Printf("warning: failed to alter visual_vector dimension, recreating asset_embeddings: %v", err)
 		if err := db.Exec(`DROP TABLE IF EXISTS asset_embeddings`).Error; err != nil {
 			return err
 		}
-		if err := db.Exec(`
-			CREATE TABLE asset_embeddings (
-				asset_id UUID REFERENCES assets(id) ON DELETE CASCADE,
-				semantic_vector vector(1024),
-				visual_vector vector(512),
-				PRIMARY KEY (asset_id)
-			)
-		`).Error; err != nil {
+		if err := db.Exec(createEmbeddings).Error; err != nil {
 			return err
 		}
 	}
 
 	indexStatements := []string{
-		`CREATE INDEX IF NOT EXISTS idx_semantic_vector ON asset_embeddings USING ivfflat (semantic_vector vector_cosine_ops) WITH (lists = 100)`,
-		`CREATE INDEX IF NOT EXISTS idx_visual_vector ON asset_embeddings USING ivfflat (visual_vector vector_cosine_ops) WITH (lists = 100)`,
+		fmt.Sprintf(`CREATE INDEX IF NOT EXISTS idx_semantic_vector ON asset_embeddings USING ivfflat (semantic_vector %s_cosine_ops) WITH (lists = 100)`, vt),
+		fmt.Sprintf(`CREATE INDEX IF NOT EXISTS idx_visual_vector ON asset_embeddings USING ivfflat (visual_vector %s_cosine_ops) WITH (lists = 100)`, vt),
 	}
 	for _, stmt := range indexStatements {
 		if err := db.Exec(stmt).Error; err != nil {
@@ -13,6 +13,28 @@ import (
 var Client *redis.Client
 var queueName string
 
+// enqueueScript pushes an asset ID only if it is not already queued. The
+// "<queue>:members" set mirrors the list contents so workers can dedup
+// without scanning the list.
+var enqueueScript = redis.NewScript(`
+if redis.call('SADD', KEYS[2], ARGV[1]) == 1 then
+	return redis.call('LPUSH', KEYS[1], ARGV[1])
+end
+return 0
+`)
+
+// popScript pops up to ARGV[1] asset IDs and removes them from the members
+// set in the same step, so PushTask never sees an ID as queued after it has
+// left the list.
+var popScript = redis.NewScript(`
+local ids = redis.call('RPOP', KEYS[1], ARGV[1])
+if not ids then
+	return {}
+end
+redis.call('SREM', KEYS[2], unpack(ids))
+return ids
+`)
+
 type Config struct {
 	Host      string
 	Port      int
@@ -79,21 +101,29 @@ func Close() error {
 	return nil
 }
 
-// PushTask pushes an asset ID to the processing queue
+// PushTask pushes an asset ID to the processing queue (no-op if already queued)
 func PushTask(ctx context.Context, assetID string) error {
-	return Client.LPush(ctx, getQueueName(), assetID).Err()
+	queue := getQueueName()
+	return enqueueScript.Run(ctx, Client, []string{queue, membersKey(queue)}, assetID).Err()
 }
 
 // PopTask pops an asset ID from the processing queue (blocking)
 func PopTask(ctx context.Context) (string, error) {
-	result, err := Client.BRPop(ctx, 0, getQueueName()).Result()
-	if err != nil {
-		return "", err
-	}
-	if len(result) < 2 {
-		return "", fmt.Errorf("no task received")
+	queue := getQueueName()
+	for {
+		ids, err := popScript.Run(ctx, Client, []string{queue, membersKey(queue)}, 1).StringSlice()
+		if err != nil {
+			return "", err
+		}
+		if len(ids) > 0 {
+			return ids[0], nil
+		}
+		// Moving the tail onto itself waits for work without taking it, so the
+		// pop and SREM still happen together in popScript.
+		if err := Client.BLMove(ctx, queue, queue, "RIGHT", "RIGHT", 0).Err(); err != nil {
+			return "", err
+		}
 	}
-	return result[1], nil
 }
 
 // GetClient returns the Redis client
@@ -101,6 +131,10 @@ func GetClient() *redis.Client {
 	return Client
 }
 
+func membersKey(queue string) string {
+	return queue + ":members"
+}
+
 func getQueueName() string {
 	if queueName == "" {
 		queueName = DefaultConfig().QueueName
@@ -293,8 +293,9 @@ func pgvectorSearch(ctx context.Context, queryVector []float64, limit int) map[s
 	}
 
 	var results []vectorResult
+	// Cast the query to the column's element type so the ivfflat index applies.
 	err := postgres.DB.WithContext(ctx).Raw(
-		`SELECT asset_id::text, (semantic_vector <=> ?::vector) as distance
+		`SELECT asset_id::text, (semantic_vector <=> ?::`+postgres.VectorType()+`) as distance
 		 FROM asset_embeddings
 		 WHERE semantic_vector IS NOT NULL
 		 ORDER BY distance ASC
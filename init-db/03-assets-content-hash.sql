@@ -0,0 +1,12 @@
+-- SHA-256 of each asset's bytes, written by the AI worker once the asset is
+-- processed. A re-upload of identical content copies the finished asset's
+-- caption, text and embeddings instead of running the models again.
+--
+-- Safe to run by hand against an existing database as well:
+--   psql -U thinkbank -d thinkbank -f init-db/03-assets-content-hash.sql
+
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS content_hash BYTEA;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_assets_content_hash
+ON assets (content_hash)
+WHERE content_hash IS NOT NULL;
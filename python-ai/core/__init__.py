@@ -3,6 +3,6 @@ ThinkBank AI Service - Core Module
 Model loaders and configuration for the AI pipeline.
 """
 
-from .config import settings
+from .config import get_settings, settings
 
-__all__ = ["settings"]
+__all__ = ["get_settings", "settings"]
@@ -4,14 +4,26 @@ Environment-based settings with Pydantic.
 """
 
 import os
+from functools import lru_cache
 from typing import Optional
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 
+# Skip .env parsing entirely when it is absent (e.g. in containers with injected env).
+_ENV_FILE = ".env" if os.path.exists(".env") else None
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
 
+    model_config = SettingsConfigDict(
+        env_file=_ENV_FILE,
+        env_file_encoding="utf-8",
+        extra="ignore",
+        frozen=True,
+        validate_default=False,
+    )
+
     # Database
     db_host: str = Field(default="localhost", alias="DB_HOST")
     db_port: int = Field(default=5432, alias="DB_PORT")
@@ -50,6 +62,17 @@ class Settings(BaseSettings):
     text_embedding_model: str = Field(
         default="BAAI/bge-m3"
     )
+    # torch | onnx | openvino (onnx/openvino need sentence-transformers[onnx]/[openvino])
+    text_embedding_backend: str = Field(
+        default="torch",
+        alias="TEXT_EMBEDDING_BACKEND"
+    )
+    # ONNX file inside the model repo for the onnx backend; empty picks the INT8
+    # export on AVX512-VNNI CPUs when the repo has one, else onnx/model.onnx.
+    text_embedding_onnx_file: str = Field(
+        default="",
+        alias="TEXT_EMBEDDING_ONNX_FILE"
+    )
     image_embedding_model: str = Field(
         default="sentence-transformers/clip-ViT-B-32"
     )
@@ -58,10 +81,26 @@ class Settings(BaseSettings):
     vision_model: str = Field(
         default="HuggingFaceTB/SmolVLM-500M-Instruct"
     )
+    # auto | fp32 | bf16 | int8 (torch dynamic quantization) | openvino (int8/int4 weights via optimum-intel)
+    vision_quant: str = Field(
+        default="auto",
+        alias="VISION_QUANT"
+    )
+    vision_compile: bool = Field(
+        default=False,
+        alias="VISION_COMPILE"
+    )
 
     # Processing
-    max_workers: int = Field(default=2)
+    max_workers: int = Field(
+        default=min(os.cpu_count() or 1, 8),
+        alias="MAX_WORKERS"
+    )
     task_queue_name: str = Field(default="thinkbank:tasks")
+    # Max task ids popped per LMPOP, and how long to block when the queue is empty
+    queue_batch_size: int = Field(default=8, alias="QUEUE_BATCH_SIZE")
+    queue_block_timeout: int = Field(default=30, alias="QUEUE_BLOCK_TIMEOUT")
+    embed_concurrency: int = Field(default=4, alias="EMBED_CONCURRENCY")
 
     @property
     def database_url(self) -> str:
@@ -71,11 +110,12 @@ class Settings(BaseSettings):
     def redis_url(self) -> str:
         return f"redis://{self.redis_host}:{self.redis_port}/{self.redis_db}"
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        extra = "ignore"
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Parse settings once per process."""
+    return Settings()
 
 
 # Global settings instance
-settings = Settings()
+settings = get_settings()
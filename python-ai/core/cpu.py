@@ -0,0 +1,22 @@
+"""
+ThinkBank AI Service - CPU Feature Detection
+Host ISA flags used to pick quantized / reduced-precision model variants.
+"""
+
+import functools
+import sys
+
+
+@functools.cache
+def _cpu_flags() -> frozenset:
+    """ISA flags of the host CPU from /proc/cpuinfo (empty when unavailable)."""
+    if sys.platform != "linux":
+        return frozenset()
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return frozenset(line.partition(":")[2].split())
+    except OSError:
+        pass
+    return frozenset()
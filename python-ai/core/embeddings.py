@@ -3,24 +3,131 @@ ThinkBank AI Service - Core Embedding Loaders
 Optimized for RTX 4070 8GB VRAM - Embeddings run on CPU
 """
 
+import functools
+import importlib.util
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Literal, Optional, Tuple
+
+import numpy as np
+import torch
 from loguru import logger
-from langchain_huggingface import HuggingFaceEmbeddings
 from sentence_transformers import SentenceTransformer
 
 from .config import settings
+from .cpu import _cpu_flags
+
+__all__ = [
+    "TextEmbeddingModel",
+    "ImageEmbeddingModel",
+    "get_text_embedder",
+    "get_image_embedder",
+    "clear_embedding_cache",
+    "quantize_int8",
+    "set_torch_threads",
+    "warmup",
+]
+
+
+_HF_INIT = False
 
 
 def _ensure_local_hf_cache() -> None:
     """Default to a project-local HF cache when env is not explicitly set."""
+    global _HF_INIT
+    if _HF_INIT:
+        return
+    _HF_INIT = True
+
     project_root = Path(__file__).resolve().parents[2]
     hf_home = Path(os.getenv("HF_HOME", str(project_root / ".hf-cache")))
     hf_home.mkdir(parents=True, exist_ok=True)
     os.environ["HF_HOME"] = str(hf_home)
     os.environ.setdefault("HUGGINGFACE_HUB_CACHE", str(hf_home / "hub"))
     os.environ.setdefault("TRANSFORMERS_CACHE", str(hf_home / "transformers"))
+    os.environ.setdefault("HF_HUB_DISABLE_SYMLINKS_WARNING", "1")
+    # Rust multi-connection downloader for cold model fetches (only if installed).
+    if importlib.util.find_spec("hf_transfer") is not None:
+        os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
+
+EmbeddingBackend = Literal["torch", "onnx", "openvino"]
+
+_torch_threads: Optional[int] = None
+
+
+def set_torch_threads(num_threads: int) -> None:
+    """Pin the intra-op thread count shared by all CPU models in this process."""
+    global _torch_threads
+    torch.set_num_threads(num_threads)
+    _torch_threads = num_threads
+
+
+def _has_avx512_vnni() -> bool:
+    return "avx512_vnni" in _cpu_flags()
+
+
+@functools.cache
+def _build_st(model_name: str, device: str, backend: EmbeddingBackend = "torch") -> SentenceTransformer:
+    """Build a SentenceTransformer once per (model, device, backend)."""
+    if device == "cpu" and _torch_threads is None:
+        set_torch_threads(os.cpu_count() or 1)
+
+    kwargs = {}
+    if backend == "onnx" and settings.text_embedding_onnx_file:
+        kwargs["model_kwargs"] = {"file_name": settings.text_embedding_onnx_file}
+    elif backend == "onnx" and _has_avx512_vnni():
+        # Dynamic INT8 export produced by sentence_transformers.export_dynamic_quantized_onnx_model.
+        # Most model repos (bge-m3 included) don't ship it; fall back to onnx/model.onnx.
+        try:
+            return SentenceTransformer(
+                model_name, device=device, trust_remote_code=True, backend=backend,
+                model_kwargs={"file_name": "onnx/model_qint8_avx512_vnni.onnx"},
+            )
+        except Exception as exc:
+            logger.warning(f"No INT8 ONNX export for {model_name}, using onnx/model.onnx: {exc}")
+    elif backend == "openvino":
+        kwargs["model_kwargs"] = {"export": True}
+
+    if backend != "torch":
+        kwargs["backend"] = backend
+    return SentenceTransformer(model_name, device=device, trust_remote_code=True, **kwargs)
+
+
+@torch.inference_mode()
+def _encode(model: SentenceTransformer, items: list) -> np.ndarray:
+    """Encode into a contiguous, L2-normalized float32 matrix."""
+    embeddings = model.encode(
+        items,
+        batch_size=max(1, min(64, len(items))),
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+    return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+
+def _open_rgb(path: str) -> "Image.Image":
+    from PIL import Image
+    with Image.open(path) as image:
+        return image.convert("RGB")
+
+
+def _iter_image_batches(image_paths: List[str], batch_size: int) -> Iterator[List["Image.Image"]]:
+    """Decode images in parallel (PIL releases the GIL) one mini-batch at a time."""
+    with ThreadPoolExecutor(max_workers=min(batch_size, os.cpu_count() or 1)) as pool:
+        for start in range(0, len(image_paths), batch_size):
+            yield list(pool.map(_open_rgb, image_paths[start:start + batch_size]))
+
+
+def quantize_int8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 scalar quantization; returns (codes, scale)."""
+    peak = np.max(np.abs(embeddings), axis=1, keepdims=True)
+    scale = 127.0 / np.maximum(peak, np.finfo(np.float32).tiny)
+    codes = np.rint(embeddings * scale).astype(np.int8)
+    return codes, scale.astype(np.float32)
 
 
 class TextEmbeddingModel:
@@ -29,8 +136,9 @@ class TextEmbeddingModel:
     Runs on CPU to save GPU memory for LLM.
     """
 
-    def __init__(self, model_name: Optional[str] = None):
+    def __init__(self, model_name: Optional[str] = None, backend: Optional[EmbeddingBackend] = None):
         self.model_name = model_name or settings.text_embedding_model
+        self.backend = backend or settings.text_embedding_backend
         self.device = "cpu"
         self.model = None
         self._loaded = False
@@ -41,32 +149,29 @@ class TextEmbeddingModel:
             return
 
         _ensure_local_hf_cache()
-        logger.info(f"Loading text embedding model: {self.model_name}")
-        self.model = HuggingFaceEmbeddings(
-            model_name=self.model_name,
-            model_kwargs={
-                "device": self.device,
-                "trust_remote_code": True,
-            },
-            encode_kwargs={
-                "normalize_embeddings": True,
-            },
-        )
+        logger.info(f"Loading text embedding model: {self.model_name} (backend={self.backend})")
+        self.model = _build_st(self.model_name, self.device, self.backend)
         self._loaded = True
         logger.info("Text embedding model loaded successfully")
 
-    def embed(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for a list of texts."""
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Generate a float32 embedding matrix for a list of texts."""
         if not self._loaded:
             self.load()
 
-        return self.model.embed_documents(texts)
+        return _encode(self.model, texts)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for a list of texts."""
+        return self.encode(texts).tolist()
+
+    def embed_int8(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Generate int8-quantized embeddings and their per-row scales."""
+        return quantize_int8(self.encode(texts))
 
     def embed_single(self, text: str) -> List[float]:
         """Generate embedding for a single text."""
-        if not self._loaded:
-            self.load()
-        return self.model.embed_query(text)
+        return self.embed([text])[0]
 
     def get_device(self) -> str:
         """Expose target device for runtime checks."""
@@ -92,14 +197,7 @@ class ImageEmbeddingModel:
 
         _ensure_local_hf_cache()
         logger.info(f"Loading image embedding model: {self.model_name}")
-        model_kwargs = {
-            "device": self.device,
-            "trust_remote_code": True,
-        }
-        self.model = SentenceTransformer(
-            self.model_name,
-            **model_kwargs,
-        )
+        self.model = _build_st(self.model_name, self.device)
         self._loaded = True
         logger.info("Image embedding model loaded successfully")
 
@@ -108,35 +206,49 @@ class ImageEmbeddingModel:
         if not self._loaded:
             self.load()
 
-        from PIL import Image
-        images = [Image.open(path).convert("RGB") for path in image_paths]
-        embeddings = self.model.encode(images, normalize_embeddings=True)
-        return embeddings.tolist()
+        if not image_paths:
+            return []
+
+        # Only one mini-batch of decoded RGB buffers is alive at a time.
+        batches = [_encode(self.model, images) for images in _iter_image_batches(image_paths, 32)]
+        return np.concatenate(batches).tolist()
 
     def embed_single(self, image_path: str) -> List[float]:
         """Generate embedding for a single image."""
         return self.embed([image_path])[0]
 
-    def embed_pil(self, image: "Image.Image") -> List[float]:
-        """Generate embedding for a PIL Image."""
+    def encode_pil(self, images: List["Image.Image"]) -> np.ndarray:
+        """Generate a float32 embedding matrix for a list of PIL Images."""
         if not self._loaded:
             self.load()
 
-        embeddings = self.model.encode([image.convert("RGB")], normalize_embeddings=True)
-        return embeddings.tolist()[0]
+        return _encode(self.model, [image.convert("RGB") for image in images])
+
+    def embed_pil(self, image: "Image.Image") -> List[float]:
+        """Generate embedding for a PIL Image."""
+        return self.encode_pil([image])[0].tolist()
+
+    def get_device(self) -> str:
+        """Expose target device for runtime checks."""
+        return self.device
 
 
 # Global instances
 _text_embedder: Optional[TextEmbeddingModel] = None
 _image_embedder: Optional[ImageEmbeddingModel] = None
+_text_lock = threading.Lock()
+_image_lock = threading.Lock()
 
 
 def get_text_embedder() -> TextEmbeddingModel:
     """Get or create the global text embedder."""
     global _text_embedder
     if _text_embedder is None:
-        _text_embedder = TextEmbeddingModel()
-        _text_embedder.load()
+        with _text_lock:
+            if _text_embedder is None:
+                embedder = TextEmbeddingModel()
+                embedder.load()
+                _text_embedder = embedder
     return _text_embedder
 
 
@@ -144,6 +256,42 @@ def get_image_embedder() -> ImageEmbeddingModel:
     """Get or create the global image embedder."""
     global _image_embedder
     if _image_embedder is None:
-        _image_embedder = ImageEmbeddingModel()
-        _image_embedder.load()
+        with _image_lock:
+            if _image_embedder is None:
+                embedder = ImageEmbeddingModel()
+                embedder.load()
+                _image_embedder = embedder
     return _image_embedder
+
+
+def clear_embedding_cache() -> None:
+    """Drop the global embedders and cached models (e.g. to release memory after an OOM).
+
+    Memory is only reclaimed once callers drop their own references too.
+    """
+    global _text_embedder, _image_embedder
+    with _text_lock:
+        _text_embedder = None
+    with _image_lock:
+        _image_embedder = None
+    _build_st.cache_clear()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+def _warmup_embedders() -> None:
+    for getter in (get_text_embedder, get_image_embedder):
+        try:
+            getter()
+        except Exception as exc:
+            logger.warning(f"Embedding warmup failed for {getter.__name__}: {exc}")
+
+
+def warmup() -> threading.Thread:
+    """Load both embedders in the background so the first request doesn't pay for it."""
+    # Two models share the CPU; avoid oversubscribing cores.
+    if _torch_threads is None:
+        set_torch_threads(max(1, (os.cpu_count() or 1) // 2))
+    thread = threading.Thread(target=_warmup_embedders, daemon=True, name="emb-warmup")
+    thread.start()
+    return thread
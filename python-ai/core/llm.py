@@ -4,8 +4,10 @@ Uses an OpenAI-compatible HTTP endpoint served by vLLM.
 """
 
 import os
-from typing import Iterator, List, Optional
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
+import httpx
 from loguru import logger
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 
@@ -17,6 +19,35 @@ except ImportError:
     LANGCHAIN_OPENAI_AVAILABLE = False
     logger.warning("langchain-openai not available. Install with: pip install langchain-openai")
 
+# Shared keep-alive pools for the LLM endpoint, sized for concurrent gRPC traffic.
+_LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", str(2 * (os.cpu_count() or 1))))
+_HTTP_LIMITS = httpx.Limits(
+    max_connections=_LLM_POOL_SIZE,
+    max_keepalive_connections=_LLM_POOL_SIZE,
+    keepalive_expiry=60.0,
+)
+_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+_HTTP_CLIENT = httpx.Client(http2=True, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+_HTTP_ACLIENT = httpx.AsyncClient(http2=True, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+
+DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant."
+_DEFAULT_SYSTEM_MESSAGE = SystemMessage(content=DEFAULT_SYSTEM_PROMPT)
+
+
+@lru_cache(maxsize=64)
+def _context_system_message(context: str) -> SystemMessage:
+    """Build (once per distinct context) the RAG system message.
+
+    Keeping the system prefix byte-identical across calls also lets the
+    vLLM server reuse its prefix cache for it.
+    """
+    return SystemMessage(
+        content=(
+            "You are a helpful assistant with access to the following context:\n\n"
+            f"{context}"
+        )
+    )
+
 
 class LLMService:
     """
@@ -39,6 +70,7 @@ class LLMService:
         self.api_url = api_url or os.getenv("LLM_API_URL", "http://127.0.0.1:8000/v1")
         self.api_key = api_key or os.getenv("LLM_API_KEY", "sk-local")
         self.client = None
+        self._bound_clients: Dict[Tuple[int, float, float], object] = {}
         self._loaded = False
 
     def load(self) -> None:
@@ -55,6 +87,8 @@ class LLMService:
             base_url=self.api_url,
             api_key=self.api_key,
             temperature=0.7,
+            http_client=_HTTP_CLIENT,
+            http_async_client=_HTTP_ACLIENT,
         )
         self._loaded = True
         logger.info("Remote LLM client initialized")
@@ -81,11 +115,18 @@ class LLMService:
     def _bound_client(self, max_tokens: int, temperature: float, top_p: float):
         if not self._loaded:
             self.load()
-        return self.client.bind(
-            max_tokens=max_tokens,
-            temperature=temperature,
-            top_p=top_p,
-        )
+        # Callers use a handful of parameter sets; reuse the bound runnables.
+        key = (max_tokens, temperature, top_p)
+        bound = self._bound_clients.get(key)
+        if bound is None:
+            bound = self.client.bind(
+                max_tokens=max_tokens,
+                temperature=temperature,
+                top_p=top_p,
+            )
+            if len(self._bound_clients) < 32:
+                self._bound_clients[key] = bound
+        return bound
 
     def generate(
         self,
@@ -99,6 +140,22 @@ class LLMService:
         response = client.invoke([HumanMessage(content=prompt)])
         return self._to_text(response.content)
 
+    async def agenerate(
+        self,
+        prompt: str,
+        max_tokens: int = 512,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+    ) -> str:
+        """Generate text without blocking the event loop.
+
+        Concurrent callers reach the vLLM server in parallel, where its
+        continuous-batching scheduler merges them.
+        """
+        client = self._bound_client(max_tokens=max_tokens, temperature=temperature, top_p=top_p)
+        response = await client.ainvoke([HumanMessage(content=prompt)])
+        return self._to_text(response.content)
+
     def generate_stream(
         self,
         prompt: str,
@@ -126,6 +183,29 @@ class LLMService:
             if text:
                 yield text
 
+    async def agenerate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 512,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+    ) -> AsyncIterator[str]:
+        """Stream generated text without blocking the event loop."""
+        client = self._bound_client(max_tokens=max_tokens, temperature=temperature, top_p=top_p)
+        has_output = False
+
+        async for chunk in client.astream([HumanMessage(content=prompt)]):
+            text = self._to_text(getattr(chunk, "content", ""))
+            if text:
+                has_output = True
+                yield text
+
+        if not has_output:
+            response = await client.ainvoke([HumanMessage(content=prompt)])
+            text = self._to_text(response.content)
+            if text:
+                yield text
+
     def chat(
         self,
         query: str,
@@ -134,19 +214,11 @@ class LLMService:
         max_tokens: int = 512,
     ) -> str:
         """Generate a chat response with optional context."""
-        messages = []
-
-        if context:
-            messages.append(
-                SystemMessage(
-                    content=(
-                        "You are a helpful assistant with access to the following context:\n\n"
-                        f"{context}"
-                    )
-                )
-            )
-        else:
-            messages.append(SystemMessage(content="You are a helpful assistant."))
+        system = _context_system_message(context) if context else _DEFAULT_SYSTEM_MESSAGE
+        messages = [system]
+        # Chat templates expect a single leading system turn; fold any system
+        # entries from history into it instead of emitting them mid-conversation.
+        extra_system: List[str] = []
 
         for msg in history:
             role = str(msg.get("role", "user")).lower()
@@ -157,10 +229,13 @@ class LLMService:
             if role in {"assistant", "ai"}:
                 messages.append(AIMessage(content=content))
             elif role == "system":
-                messages.append(SystemMessage(content=content))
+                extra_system.append(content)
             else:
                 messages.append(HumanMessage(content=content))
 
+        if extra_system:
+            messages[0] = SystemMessage(content="\n\n".join([system.content, *extra_system]))
+
         messages.append(HumanMessage(content=query))
         client = self._bound_client(max_tokens=max_tokens, temperature=0.7, top_p=0.9)
         response = client.invoke(messages)
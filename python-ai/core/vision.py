@@ -3,12 +3,14 @@ ThinkBank AI Service - Vision Captioning
 SmolVLM for image understanding - runs on CPU/Offload
 """
 
-from typing import Optional
+import re
+from typing import List, Optional, Tuple
 from PIL import Image
 from loguru import logger
 import torch
 
 from .config import settings
+from .cpu import _cpu_flags
 
 try:
     from transformers import AutoModelForVision2Seq, AutoProcessor
@@ -17,6 +19,60 @@ except ImportError:
     TRANSFORMERS_AVAILABLE = False
     logger.warning("Transformers not available. Install with: pip install transformers")
 
+try:
+    from optimum.intel import (
+        OVModelForVisualCausalLM,
+        OVPipelineQuantizationConfig,
+        OVQuantizationConfig,
+        OVWeightQuantizationConfig,
+    )
+    OPENVINO_AVAILABLE = True
+except ImportError:
+    OPENVINO_AVAILABLE = False
+
+CATEGORIES = ["Landscape", "Portrait", "Document", "Screenshot", "Food", "Animal", "Graphic Design", "Other"]
+CAPTION_PROMPT = "Describe this image with key objects and actions."
+CLASSIFY_PROMPT = (
+    f"Classify this image into one of these categories: {', '.join(CATEGORIES)}. "
+    "Return only the category name."
+)
+CAPTION_AND_CLASSIFY_PROMPT = (
+    f"{CAPTION_PROMPT}\n"
+    "Answer in exactly two lines:\n"
+    "CAPTION: <the description>\n"
+    f"CATEGORY: <one of {', '.join(CATEGORIES)}>"
+)
+# The caption may span lines; it runs until the CATEGORY marker or the end.
+_CAPTION_RE = re.compile(r"CAPTION:\s*(.+?)\s*(?:CATEGORY:|\Z)", re.IGNORECASE | re.DOTALL)
+_CATEGORY_RE = re.compile(r"CATEGORY:\s*(.+)", re.IGNORECASE)
+
+
+def _match_category(text: str) -> str:
+    lowered = text.lower()
+    for cat in CATEGORIES:
+        if cat.lower() in lowered:
+            return cat
+    return "Other"
+
+
+def _parse_caption_and_category(output: str) -> Tuple[str, str]:
+    caption_match = _CAPTION_RE.search(output)
+    category_match = _CATEGORY_RE.search(output)
+    if caption_match:
+        caption = caption_match.group(1)
+    else:
+        # Model ignored the format; keep everything before a CATEGORY line as caption.
+        caption = output[:category_match.start()] if category_match else output
+    caption = " ".join(caption.split())
+    category = _match_category(category_match.group(1)) if category_match else "Other"
+    return caption, category
+
+
+def _cpu_supports_bf16() -> bool:
+    """True when the CPU has native bf16 matmul (AVX512_BF16 or AMX)."""
+    flags = _cpu_flags()
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
 
 class VisionCaptioningModel:
     """
@@ -28,6 +84,9 @@ class VisionCaptioningModel:
         self.model_name = model_name or settings.vision_model
         self.model = None
         self.processor = None
+        self._dtype = torch.float32
+        self._prompt_cache: dict[str, Optional[str]] = {}
+        self._classify_tokens: Optional[int] = None
         self._loaded = False
 
     def load(self) -> None:
@@ -42,31 +101,76 @@ class VisionCaptioningModel:
 
         # Load on CPU to save GPU memory for LLM
         device = "cpu"
+        # use_fast selects the torchvision-backed image processor (resize/rescale/
+        # normalize as fused tensor ops); transformers falls back to the PIL/numpy
+        # one for models that don't ship a fast variant.
         self.processor = AutoProcessor.from_pretrained(
-            self.model_name,
-            trust_remote_code=True
-        )
-        self.model = AutoModelForVision2Seq.from_pretrained(
             self.model_name,
             trust_remote_code=True,
-            torch_dtype=torch.float32,
-            device_map=device,
+            use_fast=True,
         )
-        self.model.to(device)
+        tokenizer = getattr(self.processor, "tokenizer", None)
+        if tokenizer is not None:
+            # Decoder-only batched generation needs left padding.
+            tokenizer.padding_side = "left"
+
+        quant = settings.vision_quant.lower()
+        if quant == "openvino" and not OPENVINO_AVAILABLE:
+            logger.warning("VISION_QUANT=openvino but optimum-intel is not installed; falling back to auto")
+            quant = "auto"
+
+        if quant == "openvino":
+            # Weight-only int4 for the decoder, int8 for the vision tower.
+            self.model = OVModelForVisualCausalLM.from_pretrained(
+                self.model_name,
+                trust_remote_code=True,
+                quantization_config=OVPipelineQuantizationConfig(
+                    quantization_configs={
+                        "lm_model": OVWeightQuantizationConfig(bits=4),
+                        "vision_embeddings_model": OVQuantizationConfig(bits=8),
+                    },
+                    default_config=OVWeightQuantizationConfig(bits=8, sym=True),
+                    dataset="contextual",
+                ),
+            )
+            self._dtype = torch.float32
+        else:
+            if quant == "bf16" or (quant == "auto" and _cpu_supports_bf16()):
+                self._dtype = torch.bfloat16
+            else:
+                self._dtype = torch.float32
+            self.model = AutoModelForVision2Seq.from_pretrained(
+                self.model_name,
+                trust_remote_code=True,
+                torch_dtype=self._dtype,
+                device_map=device,
+            )
+            self.model.to(device)
+            if quant == "int8":
+                # Dynamic int8 Linear layers (fbgemm, VNNI where available);
+                # activations are quantized on the fly, so no calibration set is needed.
+                self.model = torch.ao.quantization.quantize_dynamic(
+                    self.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+            if settings.vision_compile:
+                # Compile forward() rather than wrapping the module: generate() on a
+                # torch.compile'd wrapper would still call the eager forward.
+                self.model.forward = torch.compile(self.model.forward, dynamic=True)
         self._loaded = True
+        logger.info(f"Vision model backend: {quant}, dtype: {self._dtype}")
+
+        if settings.vision_compile and quant != "openvino":
+            # Pay compilation cost here rather than on the first real request.
+            logger.info("Warming up compiled vision model...")
+            self.caption(Image.new("RGB", (64, 64)), max_tokens=4)
         logger.info("Vision model loaded successfully on CPU")
 
-    def caption(
-        self,
-        image: Image.Image,
-        prompt: str = "Describe this image with key objects and actions.",
-        max_tokens: int = 256,
-    ) -> str:
-        """Generate caption for an image."""
-        if not self._loaded:
-            self.load()
+    def _format_prompt(self, prompt: str) -> Optional[str]:
+        """Render (once per prompt) the chat template; None if the processor has none."""
+        if prompt in self._prompt_cache:
+            return self._prompt_cache[prompt]
 
-        # SmolVLM-like processors expose chat templates; BLIP-style processors do not.
+        formatted = None
         if hasattr(self.processor, "apply_chat_template"):
             messages = [
                 {
@@ -77,26 +181,45 @@ class VisionCaptioningModel:
                     ]
                 }
             ]
+            try:
+                formatted = self.processor.apply_chat_template(messages, add_generation_prompt=True)
+            except Exception as exc:
+                logger.warning(f"Chat template unavailable for {self.model_name}, fallback to plain prompt: {exc}")
+        self._prompt_cache[prompt] = formatted
+        return formatted
+
+    @torch.inference_mode()
+    def caption(
+        self,
+        image: Image.Image,
+        prompt: str = CAPTION_PROMPT,
+        max_tokens: int = 256,
+    ) -> str:
+        """Generate caption for an image."""
+        if not self._loaded:
+            self.load()
+
+        # SmolVLM-like processors expose chat templates; BLIP-style processors do not.
+        formatted = self._format_prompt(prompt)
+        inputs = None
+        if formatted is not None:
             try:
                 inputs = self.processor(
                     images=[image],
-                    text=self.processor.apply_chat_template(messages, add_generation_prompt=True),
+                    text=formatted,
                     return_tensors="pt",
                 )
             except Exception as exc:
                 logger.warning(f"Chat template unavailable for {self.model_name}, fallback to plain prompt: {exc}")
-                inputs = self.processor(
-                    images=image,
-                    text=prompt,
-                    return_tensors="pt",
-                )
-        else:
+        if inputs is None:
             inputs = self.processor(
                 images=image,
                 text=prompt,
                 return_tensors="pt",
             )
         inputs = {k: v.to("cpu") if hasattr(v, "to") else v for k, v in inputs.items()}
+        if "pixel_values" in inputs and self._dtype != torch.float32:
+            inputs["pixel_values"] = inputs["pixel_values"].to(self._dtype)
 
         # Generate
         input_len = inputs["input_ids"].shape[-1]
@@ -111,7 +234,7 @@ class VisionCaptioningModel:
         caption = self.processor.decode(generated_ids, skip_special_tokens=True).strip()
         return caption
 
-    def caption_path(self, image_path: str, prompt: str = "Describe this image with key objects and actions.") -> str:
+    def caption_path(self, image_path: str, prompt: str = CAPTION_PROMPT) -> str:
         """Generate caption for an image from file path."""
         image = Image.open(image_path).convert("RGB")
         return self.caption(image, prompt)
@@ -124,22 +247,92 @@ class VisionCaptioningModel:
         if not self._loaded:
             self.load()
 
-        categories = ["Landscape", "Portrait", "Document", "Screenshot", "Food", "Animal", "Graphic Design", "Other"]
-        prompt = f"Classify this image into one of these categories: {', '.join(categories)}. Return only the category name."
-
         try:
             # Re-use caption logic but with classification prompt
-            category = self.caption(image, prompt=prompt, max_tokens=16)
-            
-            # Simple cleanup
-            for cat in categories:
-                if cat.lower() in category.lower():
-                    return cat
-            return "Other"
+            category = self.caption(image, prompt=CLASSIFY_PROMPT, max_tokens=self._classify_max_tokens())
+            return _match_category(category)
         except Exception as e:
             logger.error(f"Classification failed: {e}")
             return "Other"
 
+    def _classify_max_tokens(self) -> int:
+        """Decode budget for classify(): the longest category name plus slack."""
+        if self._classify_tokens is None:
+            tokenizer = getattr(self.processor, "tokenizer", None)
+            if tokenizer is None:
+                self._classify_tokens = 16
+            else:
+                longest = max(len(tokenizer.encode(cat, add_special_tokens=False)) for cat in CATEGORIES)
+                self._classify_tokens = min(16, longest + 2)
+        return self._classify_tokens
+
+    def caption_and_classify(self, image: Image.Image, max_tokens: int = 256) -> Tuple[str, str]:
+        """Caption and classify an image with a single generate() call.
+
+        Returns ``(caption, category)``; the image is encoded once instead of
+        once per question.
+        """
+        output = self.caption(image, prompt=CAPTION_AND_CLASSIFY_PROMPT, max_tokens=max_tokens + 16)
+        return _parse_caption_and_category(output)
+
+    @torch.inference_mode()
+    def caption_batch(
+        self,
+        images: List[Image.Image],
+        prompts: Optional[List[str]] = None,
+        max_tokens: int = 256,
+    ) -> List[str]:
+        """Caption several images with one processor call and one generate()."""
+        if not self._loaded:
+            self.load()
+
+        prompts = prompts or [CAPTION_PROMPT] * len(images)
+        texts = [self._format_prompt(prompt) for prompt in prompts]
+        if len(images) == 1 or any(text is None for text in texts):
+            # Processors without chat templates don't support the batched layout.
+            return [self.caption(image, prompt=prompt, max_tokens=max_tokens) for image, prompt in zip(images, prompts)]
+
+        inputs = self.processor(
+            images=[[image] for image in images],
+            text=texts,
+            return_tensors="pt",
+            padding=True,
+        )
+        inputs = {k: v.to("cpu") if hasattr(v, "to") else v for k, v in inputs.items()}
+        if "pixel_values" in inputs and self._dtype != torch.float32:
+            inputs["pixel_values"] = inputs["pixel_values"].to(self._dtype)
+
+        # Prompts are left-padded, so generated tokens start at the same column.
+        input_len = inputs["input_ids"].shape[-1]
+        output_ids = self.model.generate(
+            **inputs,
+            max_new_tokens=max_tokens,
+            do_sample=False,
+        )
+        decoded = self.processor.batch_decode(output_ids[:, input_len:], skip_special_tokens=True)
+        return [text.strip() for text in decoded]
+
+    def caption_and_classify_batch(self, images: List[Image.Image], max_tokens: int = 256) -> List[Tuple[str, str]]:
+        """Batched caption_and_classify(); falls back to per-image calls on failure."""
+        try:
+            outputs = self.caption_batch(
+                images,
+                prompts=[CAPTION_AND_CLASSIFY_PROMPT] * len(images),
+                max_tokens=max_tokens + 16,
+            )
+            return [_parse_caption_and_category(output) for output in outputs]
+        except Exception as exc:
+            logger.warning(f"Batched captioning failed, falling back to per-image: {exc}")
+
+        results = []
+        for image in images:
+            try:
+                results.append(self.caption_and_classify(image, max_tokens=max_tokens))
+            except Exception as exc:
+                logger.warning(f"Fused caption/classify failed, captioning only: {exc}")
+                results.append((self.caption(image, max_tokens=max_tokens), "Other"))
+        return results
+
 
 # Global instance
 _vision_model: Optional[VisionCaptioningModel] = None
@@ -4,18 +4,49 @@ Lightweight FastAPI endpoint for query embedding.
 Called by Go backend for vector search.
 """
 
+import asyncio
 import sys
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import List, Optional
 
+import orjson
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel
 from loguru import logger
 
+from core.config import settings
 from core.embeddings import get_text_embedder
 
-app = FastAPI(title="ThinkBank Embed API", docs_url=None, redoc_url=None)
+
+@lru_cache(maxsize=4096)
+def _embed_response_cached(text: str) -> bytes:
+    """Embed a normalized query and serialize the response body, memoizing
+    repeated search strings.
+
+    orjson writes the float32 array straight to JSON in C, with no per-element
+    Python floats or response_model validation.
+    """
+    vector = get_text_embedder().encode([text])[0]
+    return orjson.dumps(
+        {"vector": vector, "dimensions": int(vector.shape[0])},
+        option=orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Embedding runs in threads; size the pool for concurrent requests from Go.
+    executor = ThreadPoolExecutor(max_workers=settings.embed_concurrency, thread_name_prefix="embed")
+    asyncio.get_running_loop().set_default_executor(executor)
+    yield
+    executor.shutdown(wait=False)
+
+
+app = FastAPI(title="ThinkBank Embed API", docs_url=None, redoc_url=None, lifespan=lifespan)
 
 
 class EmbedRequest(BaseModel):
@@ -34,9 +65,8 @@ async def embed_text(req: EmbedRequest):
         raise HTTPException(status_code=400, detail="Empty text")
 
     try:
-        embedder = get_text_embedder()
-        vector = embedder.embed_single(req.text.strip())
-        return EmbedResponse(vector=vector, dimensions=len(vector))
+        body = await asyncio.to_thread(_embed_response_cached, req.text.strip())
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         logger.error(f"Embed error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
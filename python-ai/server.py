@@ -17,7 +17,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from core.config import settings
 from core.llm import get_llm_service, is_llm_available
-from core.embeddings import get_text_embedder, get_image_embedder
+from core.embeddings import get_text_embedder, get_image_embedder, warmup as warmup_embedders
 from core.vision import get_vision_model
 
 # Import generated protobuf modules (will be generated by protoc)
@@ -35,15 +35,9 @@ class AiWorkerServicer:
 
     def initialize_models(self):
         """Initialize models lazily."""
-        # Initialize text embedding model (CPU). Keep service alive even if download fails.
-        logger.info("Initializing embedding models...")
-        try:
-            self.text_embedder = get_text_embedder()
-        except Exception as e:
-            logger.warning(f"Failed to initialize text embedder: {e}")
-
-        # Image embedding model can take longer to download; load lazily on first image request.
-        logger.info("Image embedding model will be loaded lazily on first request")
+        # Embedding models (CPU) load in a background thread started by serve();
+        # handlers pick them up on first use. Keep service alive even if download fails.
+        logger.info("Embedding models are warming up in the background")
 
         # Vision model is heavy; load lazily on first use to keep startup fast.
         logger.info("Vision model will be loaded lazily on first request")
@@ -101,7 +95,7 @@ class AiWorkerServicer:
         try:
             # Generate streaming response
             full_response = ""
-            for chunk in self.llm.generate_stream(query):
+            async for chunk in self.llm.agenerate_stream(query):
                 full_response += chunk
                 yield ai_service_pb2.ChatResponse(
                     chunk=chunk,
@@ -126,10 +120,13 @@ class AiWorkerServicer:
         try:
             if request.HasField("text"):
                 if self.text_embedder is None:
-                    return ai_service_pb2.EmbeddingResponse(
-                        success=False,
-                        error="Text embedding model is not available",
-                    )
+                    try:
+                        self.text_embedder = get_text_embedder()
+                    except Exception as e:
+                        return ai_service_pb2.EmbeddingResponse(
+                            success=False,
+                            error=f"Text embedding model failed to load: {e}",
+                        )
                 # Text embedding
                 embedding = self.text_embedder.embed_single(request.text)
                 return ai_service_pb2.EmbeddingResponse(
@@ -192,6 +189,9 @@ class AiWorkerServicer:
 
 async def serve():
     """Start the gRPC server."""
+    # Overlap embedding model loads with protobuf generation and port binding.
+    warmup_embedders()
+
     # Generate protobuf files first
     await generate_protobuf()
 
@@ -0,0 +1,23 @@
+from core.vision import _parse_caption_and_category
+
+
+class TestParseCaptionAndCategory:
+    def test_two_line_output(self):
+        output = "CAPTION: A cat on a sofa\nCATEGORY: Animal"
+
+        assert _parse_caption_and_category(output) == ("A cat on a sofa", "Animal")
+
+    def test_multi_line_caption_is_kept_whole(self):
+        output = "CAPTION: Two people talking\nin a room\nCATEGORY: Portrait"
+
+        assert _parse_caption_and_category(output) == ("Two people talking in a room", "Portrait")
+
+    def test_category_first(self):
+        output = "CATEGORY: Landscape\nCAPTION: A mountain lake\nat dawn"
+
+        assert _parse_caption_and_category(output) == ("A mountain lake at dawn", "Landscape")
+
+    def test_unformatted_output(self):
+        output = "A screenshot of a code editor"
+
+        assert _parse_caption_and_category(output) == ("A screenshot of a code editor", "Other")
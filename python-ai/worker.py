@@ -4,8 +4,13 @@ ThinkBank AI Worker - Entry Point
 Starts the Redis worker for async asset processing
 """
 
+import os
 import sys
 import asyncio
+
+# Must be set before torch is imported (transitively, by the processors).
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True,max_split_size_mb:512")
+
 from loguru import logger
 
 from workers.asset_processor import AssetProcessor
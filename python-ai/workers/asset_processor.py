@@ -4,27 +4,362 @@ Consumes asset processing tasks from Redis queue
 """
 
 import asyncio
+import hashlib
+import inspect
+import io
 import json
-import tempfile
-from pathlib import Path
-from typing import Optional
+import os
+import random
+import re
+import socket
+from typing import Callable, List, Optional, Tuple
 
+import numpy as np
 import redis.asyncio as aioredis
 from loguru import logger
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from PIL import Image
+from pgvector.asyncpg import register_vector
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
 
 from core.config import settings
+from core.embeddings import get_image_embedder, get_text_embedder, set_torch_threads
+from core.vision import get_vision_model
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+# Push an asset id only if it is not already queued. "<queue>:members" mirrors the
+# list contents (the Go backend enqueues through the same script).
+_ENQUEUE_LUA = """
+if redis.call('SADD', KEYS[2], ARGV[1]) == 1 then
+    return redis.call('LPUSH', KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+# Pop up to ARGV[1] ids and drop them from "<queue>:members" in one step, so an
+# enqueue can never see an id as queued after it has left the list.
+_POP_LUA = """
+local ids = redis.call('RPOP', KEYS[1], ARGV[1])
+if not ids then
+    return {}
+end
+redis.call('SREM', KEYS[2], unpack(ids))
+return ids
+"""
+
+# Delete a lease only if it still holds our token; after an expiry it may
+# belong to another worker.
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Extend a lease only while it still holds our token.
+_RENEW_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# An asset being processed is leased in Redis for this long and renewed every
+# LEASE_RENEW_SECONDS while it runs; a crashed worker's lease simply expires.
+LEASE_TTL_SECONDS = 60
+LEASE_RENEW_SECONDS = 20
+
+# Retry delays for the fetch loop after fetch errors.
+BACKOFF_MIN_SECONDS = 0.1
+BACKOFF_MAX_SECONDS = 30.0
+
+# Long-edge cap (px) for images handed to the captioner and visual embedder.
+MAX_IMAGE_SIDE = 896
+
+# Fallback Chinese tags for captions the LLM could not translate.
+KEYWORD_MAP = {
+    "女性": ("female", "woman", "girl", "lady"),
+    "男性": ("male", "man", "boy", "gentleman"),
+    "人物": ("person", "people", "character", "portrait"),
+    "动漫": ("anime", "cartoon", "manga"),
+    "舞台": ("stage", "performance", "concert"),
+    "室内": ("indoor", "inside", "room"),
+    "室外": ("outdoor", "outside"),
+}
+# One precompiled alternation per tag. A single combined pattern would miss
+# tags whose keyword overlaps an earlier match ("manga" contains "man").
+_ZH_PATTERNS = [
+    (zh, re.compile("|".join(map(re.escape, keys)), re.IGNORECASE))
+    for zh, keys in KEYWORD_MAP.items()
+]
+
+
+def _keyword_tags(caption: str) -> list:
+    """Chinese tags whose English keywords occur in ``caption``, in KEYWORD_MAP order."""
+    return [zh for zh, pattern in _ZH_PATTERNS if pattern.search(caption)]
+
+
+def _load_image(data: bytes) -> Image.Image:
+    """Decode an image to RGB with its long edge capped at MAX_IMAGE_SIDE.
+
+    The vision processor tiles large inputs into more image tokens and CLIP
+    resizes to 224px anyway, so the thumbnail is used for both.
+    """
+    image = Image.open(io.BytesIO(data))
+    # For JPEGs, let libjpeg-turbo decode at a reduced DCT scale (1/2, 1/4, 1/8)
+    # that still covers MAX_IMAGE_SIDE, instead of decoding full-res and resizing.
+    image.draft("RGB", (MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+    image = image.convert("RGB")
+    if max(image.size) > MAX_IMAGE_SIDE:
+        image.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE), Image.Resampling.LANCZOS)
+    return image
+
+
+def _extract_pdf_text(data: bytes) -> str:
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return "".join([page.get_text("text") for page in doc])
+
+
+def _members_key(queue_name: str) -> str:
+    return f"{queue_name}:members"
+
+
+def _lease_key(queue_name: str, asset_id: str) -> str:
+    return f"{queue_name}:processing:{asset_id}"
+
+
+class _MicroBatcher:
+    """Runs ``batch_fn`` over items submitted by concurrent tasks, one batch at a time.
+
+    A batch is flushed at ``max_batch`` items or ``max_wait`` seconds after its first item.
+    """
+
+    def __init__(self, batch_fn: Callable[[list], list], max_batch: int, max_wait: float = 0.05):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(self, item):
+        """Return ``batch_fn``'s result for one item."""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            items = [item for item, _ in batch]
+            try:
+                if inspect.iscoroutinefunction(self.batch_fn):
+                    results = await self.batch_fn(items)
+                else:
+                    results = await asyncio.to_thread(self.batch_fn, items)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class _ResultWriter:
+    """Writes asset results in batches, one transaction per batch."""
+
+    UPSERT_EMBEDDINGS_SQL = text("""
+        INSERT INTO asset_embeddings (asset_id, semantic_vector, visual_vector)
+        VALUES (:id, :semantic_vector, :visual_vector)
+        ON CONFLICT (asset_id) DO UPDATE
+        SET semantic_vector = EXCLUDED.semantic_vector,
+            visual_vector = COALESCE(EXCLUDED.visual_vector, asset_embeddings.visual_vector)
+    """)
+    # NULL content_text / category / content_hash leave the stored value untouched.
+    COMPLETE_ASSETS_SQL = text("""
+        UPDATE assets SET
+            caption = :caption,
+            content_text = COALESCE(CAST(:content_text AS text), content_text),
+            metadata = CASE
+                WHEN CAST(:category AS text) IS NULL THEN metadata
+                ELSE COALESCE(metadata, '{}'::jsonb) || jsonb_build_object('category', CAST(:category AS text))
+            END,
+            content_hash = COALESCE(CAST(:content_hash AS bytea), content_hash),
+            processing_status = 'COMPLETED'
+        WHERE id = :id
+    """)
+
+    def __init__(self, engine, max_batch: int = 32, max_wait: float = 0.05):
+        self.engine = engine
+        self._batcher = _MicroBatcher(self._write_batch, max_batch, max_wait)
+
+    async def submit(
+        self,
+        asset_id: str,
+        caption: str,
+        semantic_vector,
+        visual_vector=None,
+        content_text: Optional[str] = None,
+        category: Optional[str] = None,
+        content_hash: Optional[bytes] = None,
+    ) -> None:
+        """Store one asset's results and mark it COMPLETED; raises if its row failed.
+
+        A missing ``visual_vector`` keeps the stored one; without ``semantic_vector`` no embedding row is written.
+        """
+        # Postgres text rejects NUL, which text files and PDFs can contain.
+        caption = caption.replace("\x00", "")
+        if content_text is not None:
+            content_text = content_text.replace("\x00", "")
+        embedding_row = None if semantic_vector is None else {
+            "id": asset_id,
+            "semantic_vector": np.asarray(semantic_vector, dtype=np.float32),
+            "visual_vector": None if visual_vector is None else np.asarray(visual_vector, dtype=np.float32),
+        }
+        asset_row = {
+            "id": asset_id,
+            "caption": caption,
+            "content_text": content_text,
+            "category": category,
+            "content_hash": content_hash,
+        }
+        error = await self._batcher.submit((embedding_row, asset_row))
+        if error is not None:
+            raise error
+
+    async def _write_batch(self, batch: list) -> list:
+        """Write a batch; returns ``None`` or the exception for each row."""
+        try:
+            await self._write_rows(batch)
+            return [None] * len(batch)
+        except Exception as exc:
+            if len(batch) == 1:
+                return [exc]
+            logger.warning(f"Batched result write failed, retrying {len(batch)} rows one by one: {exc}")
+
+        # Retry row by row so one bad row fails only its own asset.
+        errors = []
+        for rows in batch:
+            try:
+                await self._write_rows([rows])
+                errors.append(None)
+            except Exception as exc:
+                errors.append(exc)
+        return errors
+
+    async def _write_rows(self, batch: list):
+        # Core connection in one transaction; no ORM session bookkeeping.
+        embedding_rows = [embedding_row for embedding_row, _ in batch if embedding_row is not None]
+        async with self.engine.begin() as conn:
+            if embedding_rows:
+                await conn.execute(self.UPSERT_EMBEDDINGS_SQL, embedding_rows)
+            await conn.execute(self.COMPLETE_ASSETS_SQL, [asset_row for _, asset_row in batch])
+
+    async def close(self):
+        await self._batcher.close()
 
 
 class AssetProcessor:
     """Processes assets from the Redis queue."""
 
+    # Statements are built once; SQLAlchemy caches their compiled form by identity.
+    INCOMPLETE_ASSETS_SQL = text("""
+        SELECT id::text
+        FROM assets
+        WHERE processing_status IN ('PENDING', 'PROCESSING')
+        ORDER BY created_at ASC
+    """)
+    ASSET_INFO_SQL = text("""
+        SELECT bucket_name, object_name, mime_type
+        FROM assets
+        WHERE id = :id AND processing_status <> 'COMPLETED'
+    """)
+    # Complete an asset from a finished one with identical bytes (and mime type):
+    # embeddings, caption, text and category are copied in one statement.
+    # Returns no row when there is no such asset.
+    COPY_DUPLICATE_SQL = text("""
+        WITH src AS (
+            SELECT id, caption, content_text, metadata
+            FROM assets
+            WHERE content_hash = :content_hash
+              AND mime_type = :mime_type
+              AND processing_status = 'COMPLETED'
+              AND id <> :id
+            LIMIT 1
+        ), copied AS (
+            INSERT INTO asset_embeddings (asset_id, semantic_vector, visual_vector)
+            SELECT CAST(:id AS uuid), e.semantic_vector, e.visual_vector
+            FROM asset_embeddings e JOIN src ON e.asset_id = src.id
+            ON CONFLICT (asset_id) DO UPDATE
+            SET semantic_vector = EXCLUDED.semantic_vector,
+                visual_vector = EXCLUDED.visual_vector
+        )
+        UPDATE assets SET
+            caption = src.caption,
+            content_text = src.content_text,
+            metadata = CASE
+                WHEN src.metadata ? 'category'
+                THEN COALESCE(assets.metadata, '{}'::jsonb) || jsonb_build_object('category', src.metadata -> 'category')
+                ELSE assets.metadata
+            END,
+            content_hash = :content_hash,
+            processing_status = 'COMPLETED'
+        FROM src
+        WHERE assets.id = :id
+        RETURNING src.id
+    """)
+    SET_STATUS_SQL = text("UPDATE assets SET processing_status = :status WHERE id = :id")
+
     def __init__(self):
         self.redis: Optional[aioredis.Redis] = None
         self.db_engine = None
         self.minio_client = None
+        self._enqueue = None
+        self._pop = None
+        self._release = None
+        self._renew = None
+        self.vision_model = None
+        self.text_embedder = None
+        self.image_embedder = None
+        # Model calls from all in-flight tasks are funnelled through micro-batchers,
+        # one per model, so each forward pass covers several assets.
+        self._caption_batcher = _MicroBatcher(self._caption_batch, max_batch=4)
+        self._text_embed_batcher = _MicroBatcher(self._embed_text_batch, max_batch=32)
+        self._image_embed_batcher = _MicroBatcher(self._embed_image_batch, max_batch=32)
+        self._result_writer: Optional[_ResultWriter] = None
+        self._autocommit_engine = None
+        self._lease_token = f"{socket.gethostname()}:{os.getpid()}"
+        self._requeue_tasks: set = set()
 
     async def initialize(self):
         """Initialize connections."""
@@ -34,11 +369,23 @@ class AssetProcessor:
             encoding="utf-8",
             decode_responses=True
         )
+        self._enqueue = self.redis.register_script(_ENQUEUE_LUA)
+        self._pop = self.redis.register_script(_POP_LUA)
+        self._release = self.redis.register_script(_RELEASE_LUA)
+        self._renew = self.redis.register_script(_RENEW_LUA)
         logger.info("Redis connection established")
 
         # Database connection (async)
         db_url = settings.database_url.replace("postgresql://", "postgresql+asyncpg://")
         self.db_engine = create_async_engine(db_url, echo=False)
+
+        # Bind embeddings as binary pgvector values instead of text literals.
+        @event.listens_for(self.db_engine.sync_engine, "connect")
+        def _register_vector(dbapi_connection, _connection_record):
+            dbapi_connection.run_async(register_vector)
+
+        self._autocommit_engine = self.db_engine.execution_options(isolation_level="AUTOCOMMIT")
+        self._result_writer = _ResultWriter(self.db_engine)
         logger.info("Database connection established")
 
         # MinIO client
@@ -51,37 +398,84 @@ class AssetProcessor:
         )
         logger.info("MinIO connection established")
 
+        # Captioning and embedding run concurrently on the CPU; split the cores.
+        set_torch_threads(max(1, (os.cpu_count() or 1) // 2))
+
+        await asyncio.to_thread(self._load_models)
+
         await self._requeue_incomplete_assets()
 
+    def _load_models(self):
+        """Load every model and run one tiny forward pass, so the first asset
+        doesn't pay the cold start.
+
+        A model that fails to load stays ``None`` and is loaded again by the
+        next batch that needs it, so a transient failure is not permanent.
+        """
+        warmup_image = Image.new("RGB", (64, 64))
+        loaders = (
+            ("text_embedder", get_text_embedder, lambda m: m.encode(["warmup"])),
+            ("image_embedder", get_image_embedder, lambda m: m.encode_pil([warmup_image])),
+            ("vision_model", get_vision_model, lambda m: m.caption(warmup_image, max_tokens=1)),
+        )
+        for attr, getter, warm in loaders:
+            try:
+                model = getter()
+                warm(model)
+                setattr(self, attr, model)
+            except Exception as exc:
+                logger.error(f"Failed to load {attr}: {exc}")
+        logger.info("Models loaded")
+
+    def _model(self, attr: str, getter: Callable):
+        """Return the model in ``attr``, loading it first if startup failed to.
+
+        Runs on the batcher's thread; a load failure fails only this batch.
+        """
+        model = getattr(self, attr)
+        if model is None:
+            logger.info(f"Retrying load of {attr}")
+            model = getter()
+            setattr(self, attr, model)
+        return model
+
+    def _caption_batch(self, images: list) -> List[Tuple[str, str]]:
+        return self._model("vision_model", get_vision_model).caption_and_classify_batch(images)
+
+    def _embed_text_batch(self, texts: List[str]) -> np.ndarray:
+        return self._model("text_embedder", get_text_embedder).encode(texts)
+
+    def _embed_image_batch(self, images: list) -> np.ndarray:
+        return self._model("image_embedder", get_image_embedder).encode_pil(images)
+
     async def _requeue_incomplete_assets(self):
         """Recover tasks that were left in PENDING/PROCESSING when worker restarted."""
-        async with AsyncSession(self.db_engine) as session:
-            result = await session.execute(
-                text("""
-                    SELECT id::text
-                    FROM assets
-                    WHERE processing_status IN ('PENDING', 'PROCESSING')
-                    ORDER BY created_at ASC
-                """)
-            )
+        async with self._autocommit_engine.connect() as conn:
+            result = await conn.execute(self.INCOMPLETE_ASSETS_SQL)
             candidate_ids = [row[0] for row in result.fetchall()]
 
         if not candidate_ids:
             return
 
-        queued_ids = set(await self.redis.lrange(settings.task_queue_name, 0, -1))
-        requeued = 0
+        # One round trip for the whole backlog instead of one per asset.
+        queue_keys = [settings.task_queue_name, _members_key(settings.task_queue_name)]
+        pipe = self.redis.pipeline(transaction=False)
         for asset_id in candidate_ids:
-            if asset_id in queued_ids:
-                continue
-            await self.redis.lpush(settings.task_queue_name, asset_id)
-            requeued += 1
+            await self._enqueue(keys=queue_keys, args=[asset_id], client=pipe)
+        requeued = sum(1 for pushed in await pipe.execute() if pushed)
 
         if requeued > 0:
             logger.info(f"Recovered {requeued} incomplete assets into queue")
 
     async def close(self):
         """Close connections."""
+        for task in self._requeue_tasks:
+            task.cancel()
+        await asyncio.gather(*self._requeue_tasks, return_exceptions=True)
+        for batcher in (self._caption_batcher, self._text_embed_batcher, self._image_embed_batcher):
+            await batcher.close()
+        if self._result_writer:
+            await self._result_writer.close()
         if self.redis:
             await self.redis.close()
         if self.db_engine:
@@ -91,107 +485,197 @@ class AssetProcessor:
         """Main worker loop."""
         await self.initialize()
 
-        logger.info(f"Starting worker, listening on queue: {settings.task_queue_name}")
+        logger.info(f"Starting up to {settings.max_workers} concurrent tasks, listening on queue: {settings.task_queue_name}")
+        try:
+            await self._fetch_loop()
+        finally:
+            await self.close()
 
+    async def _pop_batch(self, count: int) -> List[str]:
+        """Pop up to ``count`` task ids; blocks only when the queue is empty."""
+        queue = settings.task_queue_name
+        keys = [queue, _members_key(queue)]
+        asset_ids = await self._pop(keys=keys, args=[count])
+        if not asset_ids:
+            # Moving the tail onto itself waits for work without taking it, so
+            # the pop and SREM still happen together in the script.
+            if await self.redis.blmove(queue, queue, settings.queue_block_timeout, "RIGHT", "RIGHT") is None:
+                return []
+            asset_ids = await self._pop(keys=keys, args=[count])
+        return asset_ids
+
+    async def _fetch_loop(self):
+        """Pop task batches and process them with at most ``max_workers`` in flight."""
+        max_in_flight = max(1, settings.max_workers)
+        in_flight: set = set()
+        backoff = BACKOFF_MIN_SECONDS
         try:
             while True:
+                if len(in_flight) >= max_in_flight:
+                    await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    continue
                 try:
-                    # Block on queue
-                    result = await self.redis.brpop(settings.task_queue_name, timeout=5)
-                    if result:
-                        _, asset_id = result
-                        logger.info(f"Received task for asset: {asset_id}")
-                        await self.process_asset(asset_id)
-                except asyncio.CancelledError:
-                    break
+                    # Only take what can start now; the rest stays in Redis for other workers.
+                    count = min(settings.queue_batch_size, max_in_flight - len(in_flight))
+                    asset_ids = await self._pop_batch(count)
                 except Exception as e:
-                    logger.error(f"Error in worker loop: {e}")
-                    await asyncio.sleep(1)
+                    # Back off exponentially (with jitter, so workers don't retry in
+                    # lockstep) on any fetch error, persistent ones included.
+                    delay = backoff
+                    backoff = min(BACKOFF_MAX_SECONDS, backoff * 2)
+                    if isinstance(e, (RedisConnectionError, RedisTimeoutError, OSError)):
+                        logger.error(f"Redis unavailable, retrying in ~{delay:.1f}s: {e}")
+                    else:
+                        logger.error(f"Error fetching tasks, retrying in ~{delay:.1f}s: {e}")
+                    await asyncio.sleep(delay / 2 + random.uniform(0, delay / 2))
+                    continue
+                backoff = BACKOFF_MIN_SECONDS
+
+                for asset_id in asset_ids:
+                    logger.info(f"Received task for asset: {asset_id}")
+                    task = asyncio.create_task(self.process_asset(asset_id))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+        except asyncio.CancelledError:
+            pass
         finally:
-            await self.close()
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+    def _download(self, bucket_name: str, object_name: str) -> Tuple[bytes, bytes]:
+        """Read a MinIO object into memory; returns ``(data, sha256 digest)``."""
+        response = self.minio_client.get_object(bucket_name, object_name)
+        try:
+            data = response.read()
+        finally:
+            response.close()
+            response.release_conn()
+        # Hashed in the download thread; hashlib releases the GIL on large buffers.
+        return data, hashlib.sha256(data).digest()
+
+    async def _copy_duplicate(self, asset_id: str, mime_type: str, content_hash: bytes) -> Optional[str]:
+        """Complete ``asset_id`` from an already processed copy; returns the source id if any."""
+        async with self._autocommit_engine.connect() as conn:
+            result = await conn.execute(
+                self.COPY_DUPLICATE_SQL,
+                {"id": asset_id, "mime_type": mime_type, "content_hash": content_hash},
+            )
+            row = result.fetchone()
+        return str(row[0]) if row else None
 
     async def process_asset(self, asset_id: str):
         """Process a single asset."""
-        async with AsyncSession(self.db_engine) as session:
-            try:
-                logger.info(f"[{asset_id}] Marking status as PROCESSING")
-                # Update status to PROCESSING
-                await session.execute(
-                    text("UPDATE assets SET processing_status = 'PROCESSING' WHERE id = :id"),
-                    {"id": asset_id}
-                )
-                await session.commit()
-
-                logger.info(f"[{asset_id}] Loading asset metadata")
-                # Get asset info
-                result = await session.execute(
-                    text("SELECT bucket_name, object_name, mime_type FROM assets WHERE id = :id"),
-                    {"id": asset_id}
-                )
-                row = result.fetchone()
-
-                if not row:
-                    logger.error(f"Asset not found: {asset_id}")
+        leased = False
+        heartbeat = None
+        try:
+            # The claim is a Redis lease rather than a committed PROCESSING row:
+            # the only DB commit per asset is the terminal one.
+            logger.info(f"[{asset_id}] Claiming asset")
+            lease_key = _lease_key(settings.task_queue_name, asset_id)
+            if not await self.redis.set(lease_key, self._lease_token, nx=True, ex=LEASE_TTL_SECONDS):
+                # The holder may have crashed (its lease outlives it), so don't
+                # drop the asset: queue it again once the lease has expired.
+                delay = max(await self.redis.pttl(lease_key), 0) / 1000 + 1
+                logger.warning(f"Asset already leased: {asset_id}; re-queueing in {delay:.0f}s")
+                self._requeue_later(asset_id, delay)
+                return
+            leased = True
+            heartbeat = asyncio.create_task(self._renew_lease(lease_key))
+
+            # Autocommit read: no BEGIN/COMMIT round trips, connection back to the pool at once.
+            async with self._autocommit_engine.connect() as conn:
+                row = (await conn.execute(self.ASSET_INFO_SQL, {"id": asset_id})).fetchone()
+
+            if not row:
+                logger.warning(f"Asset not found or already completed: {asset_id}")
+                return
+
+            bucket_name, object_name, mime_type = row
+
+            if mime_type.startswith("image/"):
+                handler = self._process_image
+            elif mime_type == "application/pdf":
+                handler = self._process_document
+            elif mime_type.startswith("text/"):
+                handler = self._process_text
+            else:
+                # Nothing to extract, so don't pull (possibly large) media into memory.
+                logger.warning(f"Unsupported mime type: {mime_type}")
+                handler = None
+
+            if handler is None:
+                await self._set_status(asset_id, "COMPLETED")
+            else:
+                # Download file from MinIO straight into memory. The client is
+                # blocking; in a thread, other tasks' downloads and inference overlap it.
+                logger.info(f"[{asset_id}] Downloading from MinIO: {bucket_name}/{object_name}")
+                data, content_hash = await asyncio.to_thread(self._download, bucket_name, object_name)
+
+                source_id = await self._copy_duplicate(asset_id, mime_type, content_hash)
+                if source_id is not None:
+                    logger.info(f"Asset {asset_id} is a duplicate of {source_id}; copied its results")
                     return
 
-                bucket_name, object_name, mime_type = row
-
-                # Download file from MinIO
-                with tempfile.NamedTemporaryFile(delete=False) as tmp:
-                    logger.info(f"[{asset_id}] Downloading from MinIO: {bucket_name}/{object_name}")
-                    self.minio_client.fget_object(bucket_name, object_name, tmp.name)
-                    tmp_path = tmp.name
+                # Handlers hand their results (and the COMPLETED status) to the
+                # batched result writer, which has committed them once this returns.
+                logger.info(f"[{asset_id}] Dispatching processor for mime={mime_type}")
+                await handler(asset_id, data, content_hash)
+            logger.info(f"Asset processed successfully: {asset_id}")
 
-                try:
-                    logger.info(f"[{asset_id}] Dispatching processor for mime={mime_type}")
-                    # Route to appropriate processor
-                    if mime_type.startswith("image/"):
-                        await self._process_image(session, asset_id, tmp_path)
-                    elif mime_type == "application/pdf":
-                        await self._process_document(session, asset_id, tmp_path)
-                    elif mime_type.startswith("text/"):
-                        await self._process_text(session, asset_id, tmp_path)
-                    else:
-                        logger.warning(f"Unsupported mime type: {mime_type}")
-
-                    # Update status to COMPLETED
-                    await session.execute(
-                        text("UPDATE assets SET processing_status = 'COMPLETED' WHERE id = :id"),
-                        {"id": asset_id}
-                    )
-                    await session.commit()
-                    logger.info(f"Asset processed successfully: {asset_id}")
-
-                finally:
-                    # Cleanup temp file
-                    Path(tmp_path).unlink(missing_ok=True)
-
-            except Exception as e:
-                logger.error(f"Failed to process asset {asset_id}: {e}")
-                await session.rollback()
-                await session.execute(
-                    text("UPDATE assets SET processing_status = 'FAILED' WHERE id = :id"),
-                    {"id": asset_id}
-                )
-                await session.commit()
-
-    async def _process_image(self, session, asset_id: str, file_path: str):
+        except Exception as e:
+            logger.error(f"Failed to process asset {asset_id}: {e}")
+            await self._set_status(asset_id, "FAILED")
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+            if leased:
+                await self._release(keys=[lease_key], args=[self._lease_token])
+
+    async def _renew_lease(self, lease_key: str):
+        """Keep ``lease_key`` alive while its asset is processed, however long that takes."""
+        while True:
+            await asyncio.sleep(LEASE_RENEW_SECONDS)
+            try:
+                if not await self._renew(keys=[lease_key], args=[self._lease_token, LEASE_TTL_SECONDS]):
+                    logger.warning(f"Lease {lease_key} expired before it could be renewed")
+                    return
+            except Exception as exc:
+                # Retry on the next tick; the TTL covers a couple of missed renewals.
+                logger.warning(f"Failed to renew lease {lease_key}: {exc}")
+
+    def _requeue_later(self, asset_id: str, delay: float):
+        """Enqueue ``asset_id`` again after ``delay`` seconds, without holding a worker slot."""
+        async def requeue():
+            await asyncio.sleep(delay)
+            queue = settings.task_queue_name
+            await self._enqueue(keys=[queue, _members_key(queue)], args=[asset_id])
+
+        task = asyncio.create_task(requeue())
+        self._requeue_tasks.add(task)
+        task.add_done_callback(self._requeue_tasks.discard)
+
+    async def _set_status(self, asset_id: str, status: str):
+        """Set processing_status without storing any results (single autocommit statement)."""
+        async with self._autocommit_engine.connect() as conn:
+            await conn.execute(self.SET_STATUS_SQL, {"id": asset_id, "status": status})
+
+    async def _process_image(self, asset_id: str, data: bytes, content_hash: bytes):
         """Process an image file."""
-        from PIL import Image
-        from core.vision import get_vision_model
-        from core.embeddings import get_image_embedder, get_text_embedder
-
         logger.info(f"Processing image: {asset_id}")
 
-        # Load image
-        image = Image.open(file_path).convert("RGB")
+        # Decode/resize in a thread: Pillow releases the GIL while decoding and
+        # resampling, so the event loop keeps serving other assets meanwhile.
+        image = await asyncio.to_thread(_load_image, data)
 
-        # Generate caption from image.
-        vision_model = get_vision_model()
-        caption_en = vision_model.caption(
-            image,
-            prompt="Describe this image with key objects and actions.",
+        # The visual embedding does not depend on the caption; compute it in
+        # parallel with captioning (caption and category come from one batched
+        # pass). gather collects both, so a failure leaves no unawaited task.
+        visual_embedding, (caption_en, category) = await asyncio.gather(
+            self._image_embed_batcher.submit(image),
+            self._caption_batcher.submit(image),
         )
+        logger.info(f"Classified image as: {category}")
         caption = caption_en
 
         # Add Chinese translation to improve Chinese keyword search ("女的", "猫", etc.).
@@ -200,7 +684,7 @@ class AssetProcessor:
             from core.llm import get_llm_service
 
             llm = get_llm_service()
-            caption_zh = llm.generate(
+            caption_zh = (await llm.agenerate(
                 (
                     "Translate this image caption into concise Chinese. "
                     "Return only the Chinese sentence.\n\n"
@@ -209,37 +693,19 @@ class AssetProcessor:
                 max_tokens=96,
                 temperature=0.2,
                 top_p=0.9,
-            ).strip()
+            )).strip()
 
         except Exception as exc:
             logger.warning(f"Failed to translate image caption to Chinese: {exc}")
 
         if not caption_zh:
-            lowered = caption_en.lower()
-            keyword_map = {
-                "女性": ("female", "woman", "girl", "lady"),
-                "男性": ("male", "man", "boy", "gentleman"),
-                "人物": ("person", "people", "character", "portrait"),
-                "动漫": ("anime", "cartoon", "manga"),
-                "舞台": ("stage", "performance", "concert"),
-                "室内": ("indoor", "inside", "room"),
-                "室外": ("outdoor", "outside"),
-            }
-            tags = [zh for zh, keys in keyword_map.items() if any(key in lowered for key in keys)]
+            tags = _keyword_tags(caption_en)
             if tags:
                 caption_zh = "，".join(tags)
 
         if caption_zh:
             caption = f"{caption_en} | 中文: {caption_zh}"
 
-        # Validate and Classify
-        try:
-            category = vision_model.classify(image)
-            logger.info(f"Classified image as: {category}")
-        except Exception as e:
-            logger.warning(f"Classification failed: {e}")
-            category = "Other"
-
         # Update specific keywords based on category
         if category == "Document":
              caption += " | [Document]"
@@ -251,107 +717,53 @@ class AssetProcessor:
         # Generate embeddings:
         # - visual_vector for image-image retrieval
         # - semantic_vector from caption for text-image retrieval
-        visual_embedder = get_image_embedder()
-        visual_embedding = visual_embedder.embed_pil(image)
+        semantic_embedding = await self._text_embed_batcher.submit(caption[:2000])
 
-        text_embedder = get_text_embedder()
-        semantic_embedding = text_embedder.embed_single(caption[:2000])
-
-        # Update database
-        await session.execute(
-            text("UPDATE assets SET caption = :caption, metadata = jsonb_set(metadata, '{category}', :category) WHERE id = :id"),
-            {"caption": caption, "category": f'"{category}"', "id": asset_id}
+        # Store caption, category and embeddings; marks the asset COMPLETED
+        await self._result_writer.submit(
+            asset_id, caption, semantic_embedding, visual_embedding,
+            category=category, content_hash=content_hash,
         )
 
-        # Store embeddings (convert to pgvector string literal)
-        visual_embedding_str = "[" + ",".join(str(x) for x in visual_embedding) + "]"
-        semantic_embedding_str = "[" + ",".join(str(x) for x in semantic_embedding) + "]"
-        await session.execute(
-            text("""
-                INSERT INTO asset_embeddings (asset_id, semantic_vector, visual_vector)
-                VALUES (:id, CAST(:semantic_vector AS vector), CAST(:visual_vector AS vector))
-                ON CONFLICT (asset_id) DO UPDATE
-                SET semantic_vector = CAST(:semantic_vector AS vector),
-                    visual_vector = CAST(:visual_vector AS vector)
-            """),
-            {
-                "id": asset_id,
-                "semantic_vector": semantic_embedding_str,
-                "visual_vector": visual_embedding_str,
-            }
-        )
-        await session.commit()
-
-    async def _process_document(self, session, asset_id: str, file_path: str):
+    async def _process_document(self, asset_id: str, data: bytes, content_hash: bytes):
         """Process a PDF document."""
         logger.info(f"Processing document: {asset_id}")
 
-        # TODO: Implement PDF parsing with Docling
-        # For now, extract basic text
-        try:
-            import fitz  # PyMuPDF
-            doc = fitz.open(file_path)
-            content = ""
-            for page in doc:
-                content += page.get_text()
-            doc.close()
-
-            # Generate embedding
-            from core.embeddings import get_text_embedder
-            embedder = get_text_embedder()
-            embedding = embedder.embed_single(content[:8000])  # Limit text length
-
-            # Update database
-            # Update database with Document category
-            await session.execute(
-                text("UPDATE assets SET content_text = :text, caption = :caption, metadata = jsonb_set(metadata, '{category}', '\"Document\"') WHERE id = :id"),
-                {"text": content, "caption": content[:500], "id": asset_id}
-            )
-
-            # Store embedding
-            embedding_str = "[" + ",".join(str(x) for x in embedding) + "]"
-            await session.execute(
-                text("""
-                    INSERT INTO asset_embeddings (asset_id, semantic_vector)
-                    VALUES (:id, CAST(:vector AS vector))
-                    ON CONFLICT (asset_id) DO UPDATE SET semantic_vector = CAST(:vector AS vector)
-                """),
-                {"id": asset_id, "vector": embedding_str}
-            )
-            await session.commit()
-
-        except ImportError:
+        if fitz is None:
             logger.warning("PyMuPDF not available, skipping document processing")
+            await self._set_status(asset_id, "COMPLETED")
+            return
 
-    async def _process_text(self, session, asset_id: str, file_path: str):
+        # TODO: Implement PDF parsing with Docling
+        # For now, extract basic text. The full text is kept (content_text backs
+        # keyword search), so extraction cannot stop at the embedding limit.
+        content = await asyncio.to_thread(_extract_pdf_text, data)
+
+        # Generate embedding (limit text length; scanned PDFs may have no text at all)
+        text_for_embed = content[:8000]
+        embedding = await self._text_embed_batcher.submit(text_for_embed) if text_for_embed.strip() else None
+
+        # Store text and embedding with Document category
+        await self._result_writer.submit(
+            asset_id, content[:500], embedding,
+            content_text=content, category="Document", content_hash=content_hash,
+        )
+
+    async def _process_text(self, asset_id: str, data: bytes, content_hash: bytes):
         """Process a text file."""
         logger.info(f"Processing text: {asset_id}")
 
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        # Decode once; the embedder only sees the first 8000 chars.
+        content = data.decode("utf-8", errors="replace")
+        head = content[:8000]
 
-        # Generate embedding
-        from core.embeddings import get_text_embedder
-        embedder = get_text_embedder()
-        embedding = embedder.embed_single(content[:8000])
-
-        # Update database
-        await session.execute(
-            text("UPDATE assets SET content_text = :text, caption = :caption WHERE id = :id"),
-            {"text": content, "caption": content[:500], "id": asset_id}
-        )
+        # Generate embedding (nothing to embed for blank files)
+        embedding = await self._text_embed_batcher.submit(head) if head.strip() else None
 
-        # Store embedding
-        embedding_str = "[" + ",".join(str(x) for x in embedding) + "]"
-        await session.execute(
-            text("""
-                INSERT INTO asset_embeddings (asset_id, semantic_vector)
-                VALUES (:id, CAST(:vector AS vector))
-                ON CONFLICT (asset_id) DO UPDATE SET semantic_vector = CAST(:vector AS vector)
-            """),
-            {"id": asset_id, "vector": embedding_str}
+        # Store text and embedding
+        await self._result_writer.submit(
+            asset_id, content[:500], embedding, content_text=content, content_hash=content_hash
         )
-        await session.commit()
 
 
 async def main():
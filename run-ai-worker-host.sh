@@ -43,6 +43,17 @@ export LLM_API_URL="${LLM_API_URL:-http://127.0.0.1:${LLM_PORT:-8000}/v1}"
 export LLM_API_KEY="${LLM_API_KEY:-sk-local}"
 export LLM_MODEL="${LLM_MODEL:-Qwen/Qwen2.5-7B-Instruct-GPTQ-Int4}"
 
+# Allocator tuning for long-running model inference: cap glibc arenas, let the
+# CUDA caching allocator grow segments instead of fragmenting, and use jemalloc
+# when it is installed (e.g. apt install libjemalloc2).
+export MALLOC_ARENA_MAX="${MALLOC_ARENA_MAX:-2}"
+export PYTORCH_CUDA_ALLOC_CONF="${PYTORCH_CUDA_ALLOC_CONF:-expandable_segments:True,max_split_size_mb:512}"
+JEMALLOC_LIB="${JEMALLOC_LIB:-/usr/lib/x86_64-linux-gnu/libjemalloc.so.2}"
+if [[ -f "${JEMALLOC_LIB}" ]]; then
+  export LD_PRELOAD="${JEMALLOC_LIB}${LD_PRELOAD:+:${LD_PRELOAD}}"
+  export MALLOC_CONF="${MALLOC_CONF:-background_thread:true,metadata_thp:auto}"
+fi
+
 cd python-ai
 
 if [[ -x "${ROOT_DIR}/.venv-ai/bin/python" ]]; then
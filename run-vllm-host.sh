@@ -28,6 +28,7 @@ VLLM_MAX_MODEL_LEN="${VLLM_MAX_MODEL_LEN:-1024}"
 VLLM_DTYPE="${VLLM_DTYPE:-float16}"
 VLLM_MAX_NUM_SEQS="${VLLM_MAX_NUM_SEQS:-8}"
 VLLM_MAX_NUM_BATCHED_TOKENS="${VLLM_MAX_NUM_BATCHED_TOKENS:-256}"
+VLLM_BLOCK_SIZE="${VLLM_BLOCK_SIZE:-16}"
 ALLOC_CONF_VALUE="${PYTORCH_ALLOC_CONF:-expandable_segments:True}"
 export PYTORCH_ALLOC_CONF="${ALLOC_CONF_VALUE}"
 # Backward-compatible alias for environments still reading old variable name.
@@ -40,6 +41,7 @@ echo "gpu_memory_utilization: ${VLLM_GPU_MEMORY_UTILIZATION}"
 echo "max_model_len: ${VLLM_MAX_MODEL_LEN}"
 echo "max_num_seqs: ${VLLM_MAX_NUM_SEQS}"
 echo "max_num_batched_tokens: ${VLLM_MAX_NUM_BATCHED_TOKENS}"
+echo "prefix caching + chunked prefill: enabled (block_size=${VLLM_BLOCK_SIZE})"
 
 PYTHON_BIN="python3"
 if [[ -x "${ROOT_DIR}/.venv-vllm/bin/python" ]]; then
@@ -54,6 +56,9 @@ exec "${PYTHON_BIN}" -m vllm.entrypoints.openai.api_server \
   --max-model-len "${VLLM_MAX_MODEL_LEN}" \
   --max-num-seqs "${VLLM_MAX_NUM_SEQS}" \
   --max-num-batched-tokens "${VLLM_MAX_NUM_BATCHED_TOKENS}" \
+  --enable-prefix-caching \
+  --enable-chunked-prefill \
+  --block-size "${VLLM_BLOCK_SIZE}" \
   --dtype "${VLLM_DTYPE}" \
   --gpu-memory-utilization "${VLLM_GPU_MEMORY_UTILIZATION}" \
   --api-key "${LLM_API_KEY}"